@@ -1,67 +1,237 @@
 # app.py  –  Streamlit + PuLP (inkl. vereinfachtem CO₂-Vergleich aggregiert)
 # Stand: 04-Jun-2025 (aktualisiert: nur Gesamtemissionen vergleichen)
 
+import os
+import hashlib
+import pickle
+import threading
 import streamlit as st
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from typing import NamedTuple
 from pulp import (
-    LpProblem, LpMinimize, LpVariable,
-    lpSum, LpBinary, LpStatusOptimal, value,
+    LpProblem, LpMinimize, LpVariable, LpAffineExpression, LpConstraint,
+    LpConstraintLE, LpBinary, LpStatusOptimal, value,
+    HiGHS_CMD, PULP_CBC_CMD,
 )
 
+try:                    # optional: MILP direkt über die HiGHS-Python-API
+    import highspy
+except ImportError:
+    highspy = None
+
 # ───────────────────────────────────────────────────────────────────────────────
 st.set_page_config(page_title="Fleet Optimization", layout="wide")
 st.write("✅ App loaded")
 # ───────────────────────────────────────────────────────────────────────────────
 
+# Solver: HiGHS falls installiert, sonst der mit PuLP gelieferte CBC –
+# jeweils mit allen Kernen, ohne Konsolen-Log, mit Zeitlimit und Startlösung
+THREADS = os.cpu_count() or 1
+SOLVER = (
+    HiGHS_CMD(msg=False, threads=THREADS, timeLimit=60, warmStart=True)
+    if HiGHS_CMD(msg=False).available()
+    else PULP_CBC_CMD(msg=False, threads=THREADS, timeLimit=60, warmStart=True)
+)
+# Die Entscheidungen werden je Schiff exakt ausgezählt (siehe _solve_enumerate).
+# True löst stattdessen das MILP (_solve_milp) – erst nötig, wenn schiffsübergreifende
+# Nebenbedingungen (z. B. ein Flottenbudget) die Trennung je Schiff aufheben.
+USE_MILP = False
+# Mit highspy wird das MILP als Matrix direkt an HiGHS übergeben (kein PuLP-Modell,
+# keine Austauschdateien); False erzwingt den PuLP-Pfad, z. B. für Paritätstests.
+USE_HIGHSPY = highspy is not None
+
+# MPS-/Lösungs-Austauschdateien im RAM (tmpfs) statt auf der Platte, falls verfügbar
+if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+    SOLVER.tmpDir = "/dev/shm"
+
 # ───────────────────────────────────────────────────────────────────────────────
-# 1) Optimierungs-Funktion (mit aggregiertem CO₂-Vergleich)
+# 0) Statische Eingangsdaten (gecacht über alle Slider-Reruns)
 # ───────────────────────────────────────────────────────────────────────────────
-def run_fleet_optimization(co2_prices: dict[int, float],
-                           diesel_prices: dict[int, float],
-                           hfo_prices: dict[int, float]):
+BASE = Path(".")
+
+# Parameter-Sets (Zeitachsen, Fuel-Optionen, Diskontierung)
+YEARS_DEC  = list(range(2025, 2051, 5))
+YEARS_FULL = list(range(2025, 2051))
+BASIC      = "Diesel"
+OTHERS     = ["Lpg", "Green Methanol", "Green Ammonia"]
+FUELS      = [BASIC, "Hfo"] + OTHERS      # Spaltenreihenfolge der Fuel-Arrays
+DISCOUNT   = 0.07
+DFAC       = 1.0 / np.power(1.0 + DISCOUNT, np.arange(len(YEARS_FULL)))  # DFAC[y - 2025]
+DEC_IDX    = np.searchsorted(YEARS_FULL, YEARS_DEC)   # Spalten der Entscheidungsjahre in YEARS_FULL
+
+
+class StaticData(NamedTuple):
+    fleet:         pd.DataFrame
+    fuel_arr:      dict           # Kennzahl → (Y, len(FUELS))
+    T_COST:        np.ndarray     # (S, Y)
+    T_SAVE:        np.ndarray     # (S, Y)
+    N_COST:        np.ndarray     # (S, Y, F)
+    P_new:         np.ndarray     # (S,) Neubau-Leistung
+    energy_groups: dict           # MJ_v/MJ_e/MJ_n/share → (S,), ohne Routen = 0
+    ships:         list
+    factor:        np.ndarray     # (S,) Verbrauchsfaktor Neubau/Alt
+
+
+def _write_atomic(path: Path, write) -> None:
     """
-    co2_prices:    Dict Jahr → CO₂-Preis (USD/t)
-    diesel_prices: Dict Jahr → Diesel-Preis (USD/kg)
-    hfo_prices:    Dict Jahr → HFO-Preis (USD/kg)
+    Schreibt über eine Temp-Datei im Zielordner und os.replace – parallele Leser
+    sehen so nie eine halb geschriebene Datei. `write` bekommt den Temp-Pfad.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
 
-    Rückgabe:
-      comp_df      → DataFrame: [„Optimized“, „Diesel-only“] vs. NPV-Kosten
-      savings_df   → DataFrame: absolute und relative Ersparnis
-      summary_df   → DataFrame: pro Schiff – gewähltes Retrofit-Jahr und Neubau-Jahr/Fuel
-      co2_compare  → DataFrame: Gesamte CO₂-Emissionen optimiert vs. Baseline (t)
+
+def _read_routes(columns: list[str]) -> pd.DataFrame:
+    """
+    Liest `columns` aus shipping_routes.xlsx über einen Parquet-Sidecar. Dessen
+    Dateiname enthält einen Hash über den Inhalt der Excel-Datei und die Spalten:
+    eine geänderte Datei (auch mit älterer mtime, z. B. nach cp -p oder rsync -t)
+    oder eine andere Spaltenauswahl bekommt also einen neuen Sidecar.
     """
+    xlsx = BASE / "shipping_routes.xlsx"
+    h    = hashlib.sha1(xlsx.read_bytes())
+    h.update(repr(columns).encode())
+    pq   = BASE / f"shipping_routes.{h.hexdigest()[:16]}.parquet"
+    try:
+        return pd.read_parquet(pq, columns=columns)
+    except Exception:
+        pass    # fehlt, defekt oder ohne pyarrow → aus Excel lesen
+
+    routes = pd.read_excel(xlsx, engine="openpyxl", usecols=columns)
+    try:
+        for old in BASE.glob("shipping_routes.*.parquet"):
+            old.unlink()
+        _write_atomic(pq, lambda p: routes.to_parquet(p, index=False))
+    except Exception:
+        pass    # Sidecar ist nur ein Beschleuniger – jeder Schreibfehler heißt: weiter ohne
+    return routes
+
+
+STATIC_FILES = ("fleet_data2.1.csv", "tech_fuel_data2.csv",
+                "turbo_retrofit.1.csv", "new_ship_cost.1.csv", "new_fleet_data2.1.csv",
+                "shipping_routes.xlsx")
+
+
+def _static_cache_path() -> Path:
+    """
+    Pfad des Pickle-Caches für StaticData: der Dateiname enthält einen Hash über
+    den Inhalt aller Eingabedateien, die Achsen (Jahre, Fuels), diesen
+    Quelltext sowie pandas-/NumPy-Version und Pickle-Protokoll – geänderte
+    Daten, Ladelogik oder Umgebung landen also in einer neuen Datei.
+    """
+    h = hashlib.sha1(repr((YEARS_FULL, FUELS, pd.__version__, np.__version__,
+                           pickle.HIGHEST_PROTOCOL)).encode())
+    h.update(Path(__file__).read_bytes())
+    for name in STATIC_FILES:
+        h.update((BASE / name).read_bytes())
+    return BASE / "cache" / f"static_{h.hexdigest()[:16]}.pkl"
 
-    BASE = Path(".")
+
+@st.cache_resource
+def _load_static() -> StaticData:
+    """
+    Liefert die statischen Tabellen – im Prozess über cache_resource, über
+    Neustarts hinweg aus dem Pickle-Cache (siehe _static_cache_path).
+    Nur wenn beides fehlt, wird über _build_static neu eingelesen.
+    """
+    path = _static_cache_path()
+    try:
+        with open(path, "rb") as f:
+            return StaticData(*pickle.load(f))
+    except Exception:
+        pass    # jeder Lesefehler (auch Import-/Attributfehler beim Unpickling) gilt als Cache-Miss
+
+    static = _build_static()
+
+    def write(tmp: Path) -> None:
+        with open(tmp, "wb") as f:
+            # als schlichtes Tupel, damit der Cache nicht am Modulnamen (__main__/app) hängt
+            pickle.dump(tuple(static), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    try:
+        path.parent.mkdir(exist_ok=True)
+        _write_atomic(path, write)
+        for old in path.parent.glob("static_*.pkl"):
+            if old != path:
+                old.unlink(missing_ok=True)
+    except OSError:
+        pass    # Cache ist nur ein Beschleuniger – ohne Schreibrechte einfach weiter
+    return static
+
+
+def _build_static() -> StaticData:
+    """
+    Liest alle CSV-/Excel-Dateien ein und baut die Look-Up-Dicts auf.
+    Nichts davon hängt von den Slider-Preisen ab – daher nur einmal pro
+    Datenstand ausgeführt (siehe _load_static).
+    """
 
     # ───────────────────────────────────────────────────────────────────────────
     # 1. Daten einlesen
     # ───────────────────────────────────────────────────────────────────────────
-    fleet     = pd.read_csv(BASE / "fleet_data2.1.csv",     delimiter=";")
-    fuel      = pd.read_csv(BASE / "tech_fuel_data2.csv",   delimiter=";")
-    co2_df    = pd.read_csv(BASE / "co2_price2.1.csv",      delimiter=";")
-    turbo     = pd.read_csv(BASE / "turbo_retrofit.1.csv",  delimiter=";")
-    new_cost  = pd.read_csv(BASE / "new_ship_cost.1.csv",   delimiter=";")
-    new_specs = pd.read_csv(BASE / "new_fleet_data2.1.csv", delimiter=";")
-    routes_df = pd.read_excel(BASE / "shipping_routes.xlsx")
+    #    Nur die tatsächlich genutzten Spalten, numerische Spalten direkt als float64.
+    #    Für Dateien mit alternativen Spaltennamen wird per Callable gefiltert.
+    def cols(*names):
+        return lambda c: c in names
+
+    fleet = pd.read_csv(
+        BASE / "fleet_data2.1.csv", delimiter=";", engine="c",
+        usecols=cols("Ship_Type", "Voyages", "Power", "Energy_per_km (MJ/km)", "Energy_per_km"),
+        dtype={"Ship_Type": "string", "Voyages": "float64", "Power": "float64"},
+    )
+    fuel = pd.read_csv(
+        BASE / "tech_fuel_data2.csv", delimiter=";", engine="c",
+        usecols=["Year", "Fuel_Type", "Energy_MJ_per_kg", "CO2_g_per_MJ",
+                 "Price_USD_per_kg", "Maintenance_USD_per_kW"],
+        dtype={"Fuel_Type": "string", "Energy_MJ_per_kg": "float64", "CO2_g_per_MJ": "float64",
+               "Price_USD_per_kg": "float64", "Maintenance_USD_per_kW": "float64"},
+    ).dropna(subset=["Year"]).astype({"Year": "int64"})
+    turbo = pd.read_csv(
+        BASE / "turbo_retrofit.1.csv", delimiter=";", engine="c",
+        usecols=["Ship_Type", "Year", "Retrofit_Cost_USD", "Energy_Saving_%"],
+        dtype={"Ship_Type": "string", "Year": "int64",
+               "Retrofit_Cost_USD": "float64", "Energy_Saving_%": "float64"},
+    )
+    new_cost = pd.read_csv(
+        BASE / "new_ship_cost.1.csv", delimiter=";", engine="c",
+        usecols=["Ship_Type", "Year", "Fuel", "Capex_USD"],
+        dtype={"Ship_Type": "string", "Year": "int64", "Fuel": "string", "Capex_USD": "float64"},
+    )
+    new_specs = pd.read_csv(
+        BASE / "new_fleet_data2.1.csv", delimiter=";", engine="c",
+        usecols=cols("Ship_Type", "Energy_per_km (MJ/km)_new", "Power_kw_new", "Power"),
+        dtype={"Ship_Type": "string"},
+    )
+    routes_df = _read_routes(["Ship", "Share of ERA", "Energy Consumption [MJ] WtW"])
 
     # ───────────────────────────────────────────────────────────────────────────
     # 2. String-Spalten bereinigen
     # ───────────────────────────────────────────────────────────────────────────
-    for df in (fleet, fuel, turbo, new_cost, new_specs):
-        for col in ("Ship_Type", "Fuel", "Fuel_Type"):
-            if col in df.columns:
-                df[col] = df[col].astype(str).str.strip().str.title()
-    routes_df["Ship"] = routes_df["Ship"].astype(str).str.strip().str.title()
+    #    Nur die Schlüsselspalten, einmal strip + title direkt auf dem string-Dtype
+    #    (ohne Umweg über object). Routen-Schiff ist reiner Gruppierungsschlüssel
+    #    → zusätzlich kategorial (Integer-Codes).
+    def norm(ser):
+        return ser.astype("string").str.strip().str.title()
+
+    for df, col in ((fleet, "Ship_Type"), (fuel, "Fuel_Type"), (turbo, "Ship_Type"),
+                    (new_cost, "Ship_Type"), (new_cost, "Fuel"), (new_specs, "Ship_Type")):
+        df[col] = norm(df[col])
+    routes_df["Ship"] = norm(routes_df["Ship"]).astype("category")
 
     # ───────────────────────────────────────────────────────────────────────────
     # 3. Look-Up-Dictionaries aufbauen
     # ───────────────────────────────────────────────────────────────────────────
-    fuel_lu = fuel.set_index(["Year", "Fuel_Type"]).to_dict("index")
-    co2_lu  = co2_df.set_index("Year")["CO2_Price_EUR_per_ton"].to_dict()
-    T_COST  = turbo.set_index(["Ship_Type", "Year"])["Retrofit_Cost_USD"].to_dict()
-    T_SAVE  = turbo.set_index(["Ship_Type", "Year"])["Energy_Saving_%"].to_dict()
-    N_COST  = new_cost.set_index(["Ship_Type", "Fuel", "Year"])["Capex_USD"].to_dict()
+    fuel_arr = {
+        col: fuel.pivot_table(index="Year", columns="Fuel_Type", values=col, aggfunc="last")
+                 .reindex(index=YEARS_FULL, columns=FUELS).to_numpy(dtype=float)
+        for col in ("Energy_MJ_per_kg", "CO2_g_per_MJ", "Price_USD_per_kg", "Maintenance_USD_per_kW")
+    }
 
     new_specs = new_specs.set_index("Ship_Type")
     new_lu = {
@@ -76,194 +246,378 @@ def run_fleet_optimization(co2_prices: dict[int, float],
     # ───────────────────────────────────────────────────────────────────────────
     # 4. ERA-/ECA-Anteile pro Schiff berechnen
     # ───────────────────────────────────────────────────────────────────────────
-    routes_df = routes_df[[
-        "Ship", "Nautical Miles", "Share of ERA", "Energy Consumption [MJ] WtW"
-    ]].dropna(subset=["Ship"])
-
-    energy_groups = {}
-    for ship, grp in routes_df.groupby("Ship"):
-        tot_mj     = grp["Energy Consumption [MJ] WtW"].sum()
-        tot_mj_eca = (grp["Energy Consumption [MJ] WtW"] * grp["Share of ERA"]).sum()
-        energy_groups[ship] = {
-            "MJ_v":    tot_mj,
-            "MJ_e":    tot_mj_eca,
-            "MJ_n":    tot_mj - tot_mj_eca,
-            "share":   (tot_mj_eca / tot_mj) if tot_mj > 0 else 0.0
-        }
+    routes_df = routes_df.dropna(subset=["Ship"])
+
+    mj = "Energy Consumption [MJ] WtW"
+    eg = (
+        routes_df
+        .assign(MJ_eca=routes_df[mj] * routes_df["Share of ERA"])
+        .groupby("Ship", sort=False, observed=True)
+        .agg(MJ_v=(mj, "sum"), MJ_e=("MJ_eca", "sum"))
+    )
+    eg["MJ_n"]  = eg["MJ_v"] - eg["MJ_e"]
+    eg["share"] = (eg["MJ_e"] / eg["MJ_v"]).where(eg["MJ_v"] > 0, 0.0)
 
     # ───────────────────────────────────────────────────────────────────────────
-    # 5. Parameter-Sets
+    # 5. Schiffe + Verbrauchsfaktor Neubau/Alt
     # ───────────────────────────────────────────────────────────────────────────
-    ships      = fleet["Ship_Type"].unique()
-    YEARS_DEC  = list(range(2025, 2051, 5))
-    YEARS_FULL = list(range(2025, 2051))
-    BASIC      = "Diesel"
-    OTHERS     = ["Lpg", "Green Methanol", "Green Ammonia"]
-    discount   = 0.07
-    dfac       = lambda y: 1 / ((1 + discount) ** (y - 2025))
+    # Flotte einmal nach Schiffstyp indizieren (erste Zeile je Typ)
+    fleet  = fleet.drop_duplicates("Ship_Type").set_index("Ship_Type")
+    ships  = list(fleet.index)
+
+    # Verbrauchsfaktor und Neubau-Leistung als (S,)-Arrays in Schiffsreihenfolge
+    factor = np.ones(len(ships))
+    for i, s in enumerate(ships):
+        row   = fleet.loc[s]
+        MJold = row.get("Energy_per_km (MJ/km)", row.get("Energy_per_km"))
+        if MJold:
+            factor[i] = new_lu[s]["MJ_new"] / MJold
+    P_new = np.array([new_lu[s]["P_new"] for s in ships], dtype=float)
+
+    # ERA-Kennzahlen spaltenweise in Schiffsreihenfolge, Schiffe ohne Routen = 0
+    eg.index = eg.index.astype(str)
+    energy_groups = {c: eg[c].reindex(ships, fill_value=0.0).to_numpy(dtype=float)
+                     for c in ("MJ_v", "MJ_e", "MJ_n", "share")}
+
+    # Retrofit-/Neubau-Tabellen dicht über (Schiff, Jahr[, Fuel]), fehlende Kombinationen = 0
+    def dense(df, keys, col, axes):
+        ser = df.drop_duplicates(keys, keep="last").set_index(keys)[col]
+        return (ser.reindex(pd.MultiIndex.from_product(axes), fill_value=0.0)
+                   .to_numpy(dtype=float).reshape([len(a) for a in axes]))
+
+    T_COST = dense(turbo,    ["Ship_Type", "Year"],         "Retrofit_Cost_USD", [ships, YEARS_FULL])
+    T_SAVE = dense(turbo,    ["Ship_Type", "Year"],         "Energy_Saving_%",   [ships, YEARS_FULL])
+    N_COST = dense(new_cost, ["Ship_Type", "Year", "Fuel"], "Capex_USD",         [ships, YEARS_FULL, OTHERS])
+
+    return StaticData(fleet, fuel_arr, T_COST, T_SAVE, N_COST,
+                      P_new, energy_groups, ships, factor)
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# MILP-Gerüst (preisunabhängig)
+# ───────────────────────────────────────────────────────────────────────────────
+def _build_model_skeleton(ships: list):
+    """
+    Baut Variablen und Nebenbedingungen des MILP ohne Zielfunktion.
+    Variablen als (S, D)-Objekt-Arrays, Zugriff über Integer-Indizes.
+
+    Rückgabe: (mdl, t, n)
+    """
+    mdl = LpProblem("Fleet_Optimization", LpMinimize)
+
+    S, D = len(ships), len(YEARS_DEC)
+    t = np.array([LpVariable(f"Turbo_{s}_{y}", cat=LpBinary)
+                  for s in ships for y in YEARS_DEC], dtype=object).reshape(S, D)
+    n = np.array([LpVariable(f"New_{s}_{y}", cat=LpBinary)
+                  for s in ships for y in YEARS_DEC], dtype=object).reshape(S, D)
+
+    # Ausdrücke direkt als (Variable, Koeffizient)-Listen aufbauen statt über lpSum
+    for i in range(S):
+        mdl += LpConstraint(LpAffineExpression([(v, 1) for v in t[i]]), LpConstraintLE, rhs=1)
+        mdl += LpConstraint(LpAffineExpression([(v, 1) for v in n[i]]), LpConstraintLE, rhs=1)
+        # Retrofit nur strikt vor einem Neubau – eine aggregierte Big-M-Bedingung
+        # statt D Einzelbedingungen t[s, y] + Σ_{yy ≤ y} n[s, yy] ≤ 1.
+        # Mit Rang k = j + 1 und M = D + 1 (Σ t ≤ 1, Σ n ≤ 1):
+        #   Σ k·t − Σ k·n + M·Σ n ≤ M − 1   ⇔   k_t < k_n, falls beide gewählt
+        M = D + 1
+        mdl += LpConstraint(
+            LpAffineExpression(
+                [(t[i, j], j + 1) for j in range(D)]
+                + [(n[i, j], M - (j + 1)) for j in range(D)]
+            ),
+            LpConstraintLE, rhs=M - 1,
+        )
+
+    return mdl, t, n
+
+
+@st.cache_resource
+def _model_skeleton(ships: tuple):
+    """
+    Gerüst aus _build_model_skeleton, einmal pro Flotte gebaut und wiederverwendet.
+    Das Modell wird zwischen Sessions/Threads geteilt – Zielfunktion setzen,
+    lösen und auslesen daher nur unter dem mitgelieferten Lock.
+
+    Rückgabe: (mdl, t, n, lock)
+    """
+    mdl, t, n = _build_model_skeleton(list(ships))
+    return mdl, t, n, threading.Lock()
+
+
+@st.cache_resource
+def _highs_shell(S: int, D: int):
+    """
+    HiGHS-Instanz mit denselben Nebenbedingungen wie _build_model_skeleton und
+    Null-Zielfunktion – einmal pro Flottengröße aufgebaut, danach werden pro Lauf
+    nur die Kostenkoeffizienten getauscht.
+    Spalten: [t (S·D) | n (S·D)], zeilenweise je Schiff: Σ t ≤ 1, Σ n ≤ 1, Reihenfolge.
+
+    Rückgabe: (h, lock) – die Instanz wird geteilt, daher nur unter dem Lock lösen
+    """
+    M     = D + 1
+    k     = np.arange(1, D + 1)
+    t_col = np.arange(S * D).reshape(S, D)
+    n_col = t_col + S * D
+
+    # Je Schiff drei Zeilen mit je D bzw. 2·D Einträgen (CSR)
+    index = np.concatenate([t_col, n_col, t_col, n_col], axis=1)           # (S, 4D)
+    coef  = np.concatenate([np.ones(D), np.ones(D), k, M - k])            # (4D,)
+    start = np.cumsum([0] + [D, D, 2 * D] * S)
+
+    lp = highspy.HighsLp()
+    lp.num_col_     = 2 * S * D
+    lp.num_row_     = 3 * S
+    lp.col_cost_    = np.zeros(2 * S * D)
+    lp.col_lower_   = np.zeros(2 * S * D)
+    lp.col_upper_   = np.ones(2 * S * D)
+    lp.row_lower_   = np.full(3 * S, -highspy.kHighsInf)
+    lp.row_upper_   = np.tile([1.0, 1.0, M - 1.0], S)
+    lp.integrality_ = [highspy.HighsVarType.kInteger] * (2 * S * D)
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+    lp.a_matrix_.start_  = start
+    lp.a_matrix_.index_  = index.ravel()
+    lp.a_matrix_.value_  = np.tile(coef, S)
+
+    h = highspy.Highs()
+    h.setOptionValue("output_flag", False)
+    h.setOptionValue("threads", THREADS)
+    h.setOptionValue("time_limit", 60.0)
+    h.passModel(lp)
+    return h, threading.Lock()
+
+
+def _solve_highspy(delta_retro: np.ndarray, delta_new: np.ndarray, const: float,
+                   active: np.ndarray):
+    """
+    Löst das MILP mit der gecachten HiGHS-Instanz: nur Kosten und Spaltenschranken
+    werden gesetzt, Spalten inaktiver Schiffe (active = False) auf 0 fixiert.
+    Die Konstante (Baseline-NPV) bleibt außerhalb des Modells und wird erst auf
+    den Zielfunktionswert addiert – so misst die MIP-Lücke nur den gestaltbaren Teil.
+
+    Rückgabe: (Zielfunktionswert, t_on, n_on) mit t_on/n_on als (S, D)-Bool-Arrays
+    """
+    S, D = delta_retro.shape
+    h, lock = _highs_shell(S, D)
+    on    = np.broadcast_to(active[:, None], (S, D))
+    cost  = np.concatenate([np.where(on, delta_retro, 0.0).ravel(),
+                            np.where(on, delta_new,   0.0).ravel()])
+    upper = np.tile(on.ravel(), 2).astype(float)
+    cols  = np.arange(cost.size, dtype=np.int32)
+
+    # „Keine Maßnahme“ ist immer zulässig → als Startlösung mitgeben
+    start = highspy.HighsSolution()
+    start.col_value = [0.0] * cost.size
+
+    with lock:
+        h.changeColsCost(cost.size, cols, cost)
+        h.changeColsBounds(cost.size, cols, np.zeros(cost.size), upper)
+        h.setSolution(start)
+        h.run()
+
+        status = h.getModelStatus()
+        if status != highspy.HighsModelStatus.kOptimal:
+            raise RuntimeError(f"Modell nicht optimal (Status {h.modelStatusToString(status)})")
+
+        x   = np.asarray(h.getSolution().col_value).reshape(2, S, D) > 0.5
+        obj = const + h.getInfo().objective_function_value
+
+    return obj, x[0], x[1]
+
+
+def _solve_enumerate(delta_retro: np.ndarray, delta_new: np.ndarray, const: float):
+    """
+    Löst das Modell ohne Solver: keine Nebenbedingung koppelt Schiffe, pro Schiff
+    gibt es nur „nichts“, Retrofit j, Neubau k oder Retrofit j vor Neubau k (j < k).
+    Alle 1 + 2·D + D² Varianten werden als (S, ·)-Kostenmatrix ausgezählt.
+
+    Rückgabe: (Zielfunktionswert, t_on, n_on) wie _solve_highspy
+    """
+    S, D = delta_retro.shape
+    pair = delta_retro[:, :, None] + delta_new[:, None, :]             # (S, j, k)
+    pair[:, ~np.triu(np.ones((D, D), dtype=bool), k=1)] = np.inf       # nur j < k
+
+    # Spalten: [nichts | Retrofit j | Neubau k | Retrofit j + Neubau k]
+    opts = np.concatenate([np.zeros((S, 1)), delta_retro, delta_new,
+                           pair.reshape(S, D * D)], axis=1)
+    best = opts.argmin(axis=1)
+    rows = np.arange(S)
+
+    # Retrofit-/Neubau-Index je Variante (-1 = keine)
+    none = np.full(D, -1)
+    t_of = np.concatenate([[-1], np.arange(D), none, np.repeat(np.arange(D), D)])[best]
+    n_of = np.concatenate([[-1], none, np.arange(D), np.tile(np.arange(D), D)])[best]
+
+    t_on = np.zeros((S, D), dtype=bool)
+    n_on = np.zeros((S, D), dtype=bool)
+    t_on[rows[t_of >= 0], t_of[t_of >= 0]] = True
+    n_on[rows[n_of >= 0], n_of[n_of >= 0]] = True
+
+    return const + float(opts[rows, best].sum()), t_on, n_on
+
+
+def _solve_milp(ships: list, delta_retro: np.ndarray, delta_new: np.ndarray, const: float):
+    """
+    Löst das MILP über highspy bzw. das gecachte PuLP-Gerüst – nur mit USE_MILP,
+    falls später schiffsübergreifende Nebenbedingungen hinzukommen.
+
+    Rückgabe: (Zielfunktionswert, t_on, n_on) wie _solve_highspy
+    """
+    # Schiffe ohne lohnende Maßnahme (alle Deltas ≥ 0, z. B. ohne Routendaten) werden
+    # nicht optimiert: da das Problem je Schiff separiert, ist für sie „keine Maßnahme“
+    # optimal. Ihre Variablen bekommen Kosten 0 und Obergrenze 0 – das Modell selbst
+    # bleibt das der ganzen Flotte, damit pro Flotte nur ein Gerüst im Cache liegt.
+    active = (delta_retro < 0).any(axis=1) | (delta_new < 0).any(axis=1)
+    if not active.any():
+        return const, np.zeros(delta_retro.shape, dtype=bool), np.zeros(delta_new.shape, dtype=bool)
+
+    if USE_HIGHSPY:
+        return _solve_highspy(delta_retro, delta_new, const, active)
+
+    # Gerüst (Variablen + Nebenbedingungen) hängt nur von der Flotte ab und wird
+    # wiederverwendet – neu gesetzt werden Zielfunktion und Obergrenzen.
+    mdl, t, n, lock = _model_skeleton(tuple(ships))
+
+    on = active[:, None]
+    obj_terms = (
+        list(zip(t.ravel(), np.where(on, delta_retro, 0.0).ravel().tolist()))
+        + list(zip(n.ravel(), np.where(on, delta_new, 0.0).ravel().tolist()))
+    )
+    with lock:
+        # Konstante außerhalb des Modells halten (siehe _solve_highspy)
+        mdl.setObjective(LpAffineExpression(obj_terms))
+
+        # Obergrenzen je Schiff (inaktiv → 0) und „Keine Maßnahme“ als Startlösung
+        # (warmStart) vor jedem Lauf setzen – sonst gälten die Werte des Vorgängers
+        for i, up in enumerate(active.astype(int).tolist()):
+            for v in (*t[i], *n[i]):
+                v.upBound = up
+                v.setInitialValue(0)
+
+        mdl.solve(SOLVER)
+
+        if mdl.status != LpStatusOptimal:
+            raise RuntimeError(f"Modell nicht optimal (Status {mdl.status})")
+
+        # Lösung einmal als (S, D)-Bool-Arrays auslesen
+        obj_opt = const + value(mdl.objective)
+        t_on = np.array([v.varValue or 0.0 for v in t.ravel()]).reshape(t.shape) > 0.5
+        n_on = np.array([v.varValue or 0.0 for v in n.ravel()]).reshape(n.shape) > 0.5
+
+    return obj_opt, t_on, n_on
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# 1) Optimierungs-Funktion (mit aggregiertem CO₂-Vergleich)
+# ───────────────────────────────────────────────────────────────────────────────
+def run_fleet_optimization(co2_prices: dict[int, float],
+                           diesel_prices: dict[int, float],
+                           hfo_prices: dict[int, float]):
+    """
+    co2_prices:    Dict Jahr → CO₂-Preis (USD/t)
+    diesel_prices: Dict Jahr → Diesel-Preis (USD/kg)
+    hfo_prices:    Dict Jahr → HFO-Preis (USD/kg)
+
+    Rückgabe:
+      comp_df      → DataFrame: [„Optimized“, „Diesel-only“] vs. NPV-Kosten
+      savings_df   → DataFrame: absolute und relative Ersparnis
+      summary_df   → DataFrame: pro Schiff – gewähltes Retrofit-Jahr und Neubau-Jahr/Fuel
+      co2_compare  → DataFrame: Gesamte CO₂-Emissionen optimiert vs. Baseline (t)
+    """
+
+    (fleet, fuel_arr, T_COST, T_SAVE, N_COST,
+     P_new, energy_groups, ships, factor) = _load_static()
 
     # ───────────────────────────────────────────────────────────────────────────
     # 6. Diskontierte Jahreskosten pro Schiff/Jahr berechnen
     #    (Baseline, operative Retrofit, operative Neubau + Capex)
+    #    Vektorisiert: Achsen Schiff (S) × Jahr (Y) [× Fuel (F)]
     # ───────────────────────────────────────────────────────────────────────────
-    baseline_cost = {}
-    retro_cost    = {}
-    new_cost_op   = {}
-
-    for s in ships:
-        row = fleet.loc[fleet.Ship_Type == s].iloc[0]
-        voy   = row["Voyages"]
-        P     = row["Power"]
-        MJold = row.get("Energy_per_km (MJ/km)", row.get("Energy_per_km"))
-
-        grp = energy_groups.get(s, {"MJ_v":0.0, "MJ_e":0.0, "MJ_n":0.0, "share":0.0})
-        MJv, MJe, MJn, share = grp["MJ_v"], grp["MJ_e"], grp["MJ_n"], grp["share"]
-
-        MJnew = new_lu[s]["MJ_new"]
-        Pnew  = new_lu[s]["P_new"]
-        factor = (MJnew / MJold) if MJold else 1.0
-
-        # 6.1 Baseline-Jahreskosten
-        for y in YEARS_FULL:
-            # 6.1.1 Fuel ECA (Diesel)
-            cost_eca = 0.0
-            if MJe > 0:
-                kg_eca = (MJe * voy) / fuel_lu[(y, BASIC)]["Energy_MJ_per_kg"]
-                cost_eca = kg_eca * diesel_prices[y]
-
-            # 6.1.2 Fuel non-ECA (HFO) – wird aus hfo_prices bezogen
-            cost_noeca = 0.0
-            if MJn > 0:
-                kg_no = (MJn * voy) / fuel_lu[(y, "Hfo")]["Energy_MJ_per_kg"]
-                cost_noeca = kg_no * hfo_prices[y]
-
-            # 6.1.3 CO₂-Kosten (gemischt Diesel/HFO)
-            co2_amt = 0.0
-            if MJv > 0:
-                ef_diesel = fuel_lu[(y, BASIC)]["CO2_g_per_MJ"]
-                ef_hfo    = fuel_lu[(y, "Hfo")]    ["CO2_g_per_MJ"]
-                co2g = MJv * voy * (share * ef_diesel + (1 - share) * ef_hfo)
-                co2_amt = (co2g / 1_000_000) * co2_prices[y]
-
-            # 6.1.4 Wartungskosten (gemischt Diesel/HFO)
-            if MJv > 0:
-                ma = P * (
-                    share * fuel_lu[(y, BASIC)]["Maintenance_USD_per_kW"]
-                    + (1 - share) * fuel_lu[(y, "Hfo")]["Maintenance_USD_per_kW"]
-                )
-            else:
-                ma = P * fuel_lu[(y, BASIC)]["Maintenance_USD_per_kW"]
-
-            baseline_cost[(s, y)] = (cost_eca + cost_noeca + co2_amt + ma) * dfac(y)
-
-            # ────────────────────────────────────────────────────────
-            # 6.2 Retrofit-Kosten ab Jahr y (operativ + Capex)
-            # ────────────────────────────────────────────────────────
-            save_pct = T_SAVE.get((s, y), 0) / 100
-            MJe_r = MJe * voy * (1 - save_pct)
-            MJn_r = MJn * voy * (1 - save_pct)
-
-            cost_eca_r = 0.0
-            if MJe_r > 0:
-                cost_eca_r = (MJe_r / fuel_lu[(y, BASIC)]["Energy_MJ_per_kg"]) * diesel_prices[y]
-            cost_noeca_r = 0.0
-            if MJn_r > 0:
-                cost_noeca_r = (MJn_r / fuel_lu[(y, "Hfo")]["Energy_MJ_per_kg"]) * hfo_prices[y]
-
-            co2_r = 0.0
-            if MJv > 0:
-                ef_diesel = fuel_lu[(y, BASIC)]["CO2_g_per_MJ"]
-                ef_hfo    = fuel_lu[(y, "Hfo")]    ["CO2_g_per_MJ"]
-                co2g_r = MJe_r * ef_diesel + MJn_r * ef_hfo
-                co2_r = (co2g_r / 1_000_000) * co2_prices[y]
-
-            ma_r = ma
-            capex_r = T_COST.get((s, y), 0) * dfac(y)
-            retro_cost[(s, y)] = ((cost_eca_r + cost_noeca_r + co2_r + ma_r) * dfac(y)) + capex_r
-
-            # ────────────────────────────────────────────────────────
-            # 6.3 Neubau-Kosten ab Jahr y, Fuel f (operativ + Capex)
-            # ────────────────────────────────────────────────────────
-            MJv_n = MJv * voy * factor
-            MJn_n = MJn * voy * factor
-
-            for f in OTHERS:
-                cost_eca_n = 0.0
-                if MJv_n > 0:
-                    cost_eca_n = (MJv_n / fuel_lu[(y, f)]["Energy_MJ_per_kg"]) * fuel_lu[(y, f)]["Price_USD_per_kg"]
-
-                cost_noeca_n = 0.0
-                if MJn_n > 0:
-                    cost_noeca_n = (MJn_n / fuel_lu[(y, f)]["Energy_MJ_per_kg"]) * fuel_lu[(y, f)]["Price_USD_per_kg"]
-
-                ef_f = fuel_lu[(y, f)]["CO2_g_per_MJ"]
-                co2_n = ((MJv_n + MJn_n) * ef_f / 1_000_000) * co2_prices[y]
-
-                ma_n = new_lu[s]["P_new"] * fuel_lu[(y, f)]["Maintenance_USD_per_kW"]
-                capex_n = N_COST.get((s, f, y), 0) * dfac(y)
-
-                new_cost_op[(s, y, f)] = ((cost_eca_n + cost_noeca_n + co2_n + ma_n) * dfac(y)) + capex_n
+    # Spaltenvektoren (S, 1)
+    voy   = fleet.loc[ships, "Voyages"].to_numpy(dtype=float)[:, None]
+    P     = fleet.loc[ships, "Power"].to_numpy(dtype=float)[:, None]
+    MJv   = energy_groups["MJ_v"][:, None]
+    MJe   = energy_groups["MJ_e"][:, None]
+    MJn   = energy_groups["MJ_n"][:, None]
+    share = energy_groups["share"][:, None]
+    fac   = factor[:, None]
+    Pnew  = P_new[:, None]
+
+    # Zeilenvektoren (Y,)
+    co2_p  = np.array([co2_prices[y]     for y in YEARS_FULL], dtype=float)
+    dsl_p  = np.array([diesel_prices[y]  for y in YEARS_FULL], dtype=float)
+    hfo_p  = np.array([hfo_prices[y]     for y in YEARS_FULL], dtype=float)
+
+    # Fuel-Kennzahlen (Y, len(FUELS)): Spalte 0 = Diesel, 1 = HFO, 2: = OTHERS
+    E, EF, PR, MA = (fuel_arr[c] for c in ("Energy_MJ_per_kg", "CO2_g_per_MJ",
+                                           "Price_USD_per_kg", "Maintenance_USD_per_kW"))
+    E_d,  E_h  = E[:, 0],  E[:, 1]
+    EF_d, EF_h = EF[:, 0], EF[:, 1]
+    MA_d, MA_h = MA[:, 0], MA[:, 1]
+
+    # 6.1 Baseline-Jahreskosten (S, Y)
+    cost_eca   = (MJe * voy) / E_d * dsl_p                                   # ECA: Diesel
+    cost_noeca = (MJn * voy) / E_h * hfo_p                                   # non-ECA: HFO
+    co2_amt    = MJv * voy * (share * EF_d + (1 - share) * EF_h) / 1_000_000 * co2_p
+    ma = np.where(MJv > 0, P * (share * MA_d + (1 - share) * MA_h), P * MA_d)
+
+    base_arr = (cost_eca + cost_noeca + co2_amt + ma) * DFAC
+
+    # 6.2 Retrofit: operative Mehrkosten ggü. Baseline ab Jahr y, (S, Y)
+    #     Wartung ist identisch und kürzt sich; Kraftstoff- und CO₂-Kosten sinken
+    #     beide um save_pct (MJe = share·MJv, MJn = (1 − share)·MJv).
+    save_pct   = T_SAVE / 100
+    retro_diff = -save_pct * (cost_eca + cost_noeca + co2_amt) * DFAC
+
+    # 6.3 Neubau: operative Kosten ab Jahr y, Fuel f, (S, Y, F)
+    E_f, PR_f, EF_f, MA_f = E[:, 2:], PR[:, 2:], EF[:, 2:], MA[:, 2:]
+    MJv_n = (MJv * voy * fac)[:, :, None]
+    MJn_n = (MJn * voy * fac)[:, :, None]
+
+    cost_eca_n   = MJv_n / E_f * PR_f
+    cost_noeca_n = MJn_n / E_f * PR_f
+    co2_n        = (MJv_n + MJn_n) * EF_f / 1_000_000 * co2_p[:, None]
+    ma_n         = Pnew[:, :, None] * MA_f
+
+    new_arr = (cost_eca_n + cost_noeca_n + co2_n + ma_n) * DFAC[:, None]
+
+    # 6.4 Capex (T_COST, N_COST) fällt einmalig im Umsetzungsjahr an und wird daher
+    #     nicht mit den Jahreskosten aufsummiert, sondern erst in 7) je Entscheidungsjahr
+    #     addiert – sonst würde jede spätere Tabellenzeile erneut berechnet.
+    capex_retro = (T_COST * DFAC)[:, DEC_IDX]                              # (S, D)
+    capex_new   = (N_COST * DFAC[:, None])[:, DEC_IDX]                     # (S, D, F)
 
     # ───────────────────────────────────────────────────────────────────────────
     # 7) Barwerte (NPV) berechnen: pv_base, delta_retro, delta_new
+    #    Rückwärts-Kumulsumme über die Jahre: cum[..., i] = Σ_{j ≥ i} (opt − base)[..., j]
     # ───────────────────────────────────────────────────────────────────────────
-    pv_base = {s: sum(baseline_cost[(s, y)] for y in YEARS_FULL) for s in ships}
-
-    delta_retro = {}
-    for s in ships:
-        for y0 in YEARS_DEC:
-            diff_sum = sum(
-                (retro_cost[(s, y)] - baseline_cost[(s, y)])
-                for y in YEARS_FULL if y >= y0
-            )
-            delta_retro[(s, y0)] = diff_sum
-
-    delta_new = {}
-    for s in ships:
-        for y0 in YEARS_DEC:
-            for f in OTHERS:
-                diff_sum = sum(
-                    (new_cost_op[(s, y, f)] - baseline_cost[(s, y)])
-                    for y in YEARS_FULL if y >= y0
-                )
-                delta_new[(s, y0, f)] = diff_sum
+    pv_base  = base_arr.sum(axis=1)                                  # (S,)
+    obj_base = float(pv_base.sum())                                  # Diesel-only-NPV der Flotte
 
-    # ───────────────────────────────────────────────────────────────────────────
-    # 8) MILP-Modell aufsetzen (rein linear)
-    # ───────────────────────────────────────────────────────────────────────────
-    mdl = LpProblem("Fleet_Optimization", LpMinimize)
+    cum_retro = np.cumsum(retro_diff[:, ::-1], axis=1)[:, ::-1]
+    cum_new   = np.cumsum((new_arr - base_arr[:, :, None])[:, ::-1], axis=1)[:, ::-1]
 
-    t = LpVariable.dicts("Turbo", [(s, y) for s in ships for y in YEARS_DEC], cat=LpBinary)
-    n = LpVariable.dicts("New",   [(s, y, f) for s in ships for y in YEARS_DEC for f in OTHERS], cat=LpBinary)
-
-    for s in ships:
-        mdl += lpSum(t[(s, y)] for y in YEARS_DEC) <= 1
-        mdl += lpSum(n[(s, y, f)] for y in YEARS_DEC for f in OTHERS) <= 1
-        for y in YEARS_DEC:
-            mdl += (
-                t[(s, y)]
-                <= 1
-                - lpSum(n[(s, yy, f)] for yy in YEARS_DEC if yy <= y for f in OTHERS)
-            )
-
-    mdl += (
-        lpSum(pv_base[s] for s in ships)
-        + lpSum(delta_retro[(s, y)] * t[(s, y)] for s in ships for y in YEARS_DEC)
-        + lpSum(delta_new[(s, y, f)] * n[(s, y, f)]
-                for s in ships for y in YEARS_DEC for f in OTHERS)
-    )
+    delta_retro = cum_retro[:, DEC_IDX] + capex_retro                # (S, D)
 
-    mdl.solve()
+    # Fuel-Achse vorab eliminieren: der Neubau-Fuel koppelt an keine Nebenbedingung,
+    # pro (s, y0) ist also nur der günstigste Fuel relevant → 1 statt |OTHERS| Binärvariablen
+    cum_new_dec = cum_new[:, DEC_IDX] + capex_new                    # (S, D, F)
+    best_f      = cum_new_dec.argmin(axis=2)                         # (S, D)
+    delta_new   = cum_new_dec.min(axis=2)                            # (S, D)
 
-    if mdl.status != LpStatusOptimal:
-        raise RuntimeError(f"Modell nicht optimal (Status {mdl.status})")
+    # Jahreskosten-Tensoren werden ab hier nicht mehr gebraucht – vor dem Lösen freigeben
+    del base_arr, retro_diff, new_arr, cum_retro, cum_new, cum_new_dec
 
     # ───────────────────────────────────────────────────────────────────────────
-    # 9) Ergebnis-Reporting (Kosten & Entscheidungen)
+    # 8) Entscheidungen optimieren (Auszählung je Schiff bzw. MILP)
     # ───────────────────────────────────────────────────────────────────────────
-    obj_opt  = value(mdl.objective)
-    obj_base = sum(pv_base[s] for s in ships)
+    if USE_MILP:
+        obj_opt, t_on, n_on = _solve_milp(ships, delta_retro, delta_new, obj_base)
+    else:
+        obj_opt, t_on, n_on = _solve_enumerate(delta_retro, delta_new, obj_base)
 
+    # ───────────────────────────────────────────────────────────────────────────
+    # 9) Ergebnis-Reporting (Kosten & Entscheidungen)
+    # ───────────────────────────────────────────────────────────────────────────
     comp_df = pd.DataFrame({
         "Variant": ["Optimized", "Diesel-only"],
         "Cost NPV (USD)": [obj_opt, obj_base]
@@ -273,74 +627,46 @@ def run_fleet_optimization(co2_prices: dict[int, float],
         "Value":      [obj_base - obj_opt, (obj_base - obj_opt) / obj_base * 100]
     })
 
+    # Erstes gesetztes Jahr je Schiff, sonst -1
+    t_idx = np.where(t_on.any(axis=1), t_on.argmax(axis=1), -1)
+    n_idx = np.where(n_on.any(axis=1), n_on.argmax(axis=1), -1)
+
     summary = []
-    decisions = {}
-    for s in ships:
-        ty = next((y for y in YEARS_DEC if value(t[(s, y)]) > 0.5), None)
-        chosen = [(y, f) for y in YEARS_DEC for f in OTHERS if value(n[(s, y, f)]) > 0.5]
-        if chosen:
-            ny, fuel_choice = chosen[0]
-        else:
-            ny, fuel_choice = (None, None)
+    for i, s in enumerate(ships):
+        ti, nj = t_idx[i], n_idx[i]
+        ty = YEARS_DEC[ti] if ti >= 0 else None
+        ny = YEARS_DEC[nj] if nj >= 0 else None
+        fuel_choice = OTHERS[best_f[i, nj]] if nj >= 0 else None
         summary.append({
             "Ship":       s,
             "Turbo_Year": ty,
             "New_Year":   ny,
             "Fuel":       fuel_choice
         })
-        decisions[s] = {"retro_year": ty, "new_year": ny, "new_fuel": fuel_choice}
 
     summary_df = pd.DataFrame(summary)
 
     # ───────────────────────────────────────────────────────────────────────────
     # 10) Aggregierte CO₂-Emissionen berechnen: Optimiert vs. Baseline
     # ───────────────────────────────────────────────────────────────────────────
-    total_co2_opt = 0.0
-    total_co2_base = 0.0
-
-    for s in ships:
-        row = fleet.loc[fleet.Ship_Type == s].iloc[0]
-        voy   = row["Voyages"]
-        MJold = row.get("Energy_per_km (MJ/km)", row.get("Energy_per_km"))
-
-        grp = energy_groups.get(s, {"MJ_v":0.0, "MJ_e":0.0, "MJ_n":0.0, "share":0.0})
-        MJe = grp["MJ_e"]
-        MJn = grp["MJ_n"]
-        MJv = grp["MJ_v"]
-        factor = (new_lu[s]["MJ_new"] / MJold) if MJold else 1.0
-
-        retrofit_year = decisions[s]["retro_year"]
-        new_year      = decisions[s]["new_year"]
-        new_fuel      = decisions[s]["new_fuel"]
-
-        for y in YEARS_FULL:
-            # ── Baseline-CO₂ (immer Alte Flotte, Diesel/HFO) ───────────────
-            ef_db = fuel_lu[(y, "Diesel")]["CO2_g_per_MJ"]
-            ef_hb = fuel_lu[(y, "Hfo")]   ["CO2_g_per_MJ"]
-            co2g_base = MJe * voy * ef_db + MJn * voy * ef_hb
-            total_co2_base += co2g_base / 1_000_000
-
-            # ── Optimierte CO₂ (abhängig von Retrofit/Neubau) ─────────────
-            if new_year is not None and y >= new_year:
-                # Neubau mit new_fuel
-                MJe_n = MJe * voy * factor
-                MJn_n = MJn * voy * factor
-                ef_fn = fuel_lu[(y, new_fuel)]["CO2_g_per_MJ"]
-                co2g_opt = (MJe_n + MJn_n) * ef_fn
-            elif retrofit_year is not None and y >= retrofit_year:
-                # Retrofit reduziert MJe/MJn
-                save_pct = T_SAVE.get((s, retrofit_year), 0) / 100
-                MJe_r = MJe * voy * (1 - save_pct)
-                MJn_r = MJn * voy * (1 - save_pct)
-                ef_dr = fuel_lu[(y, "Diesel")]["CO2_g_per_MJ"]
-                ef_hr = fuel_lu[(y, "Hfo")]   ["CO2_g_per_MJ"]
-                co2g_opt = MJe_r * ef_dr + MJn_r * ef_hr
-            else:
-                # Keine Maßnahme: Baseline-Verbrauch
-                co2g_opt = MJe * voy * fuel_lu[(y, "Diesel")]["CO2_g_per_MJ"] \
-                         + MJn * voy * fuel_lu[(y, "Hfo")]   ["CO2_g_per_MJ"]
-
-            total_co2_opt += co2g_opt / 1_000_000
+    #     Vektorisiert über (S, Y): je Schiff gilt ab Neubau-Jahr der Neubau, sonst
+    #     ab Retrofit-Jahr der Retrofit (Einsparung des Retrofit-Jahres), sonst Baseline.
+    rows  = np.arange(len(ships))
+    dec_y = np.array(YEARS_DEC)
+    ty    = np.where(t_idx >= 0, dec_y[t_idx], np.inf)[:, None]           # ohne Maßnahme: nie
+    ny    = np.where(n_idx >= 0, dec_y[n_idx], np.inf)[:, None]
+    save  = np.where(t_idx >= 0, T_SAVE[rows, DEC_IDX[t_idx]], 0.0)[:, None] / 100
+    f_sel = best_f[rows, np.maximum(n_idx, 0)]                            # nur relevant, falls Neubau
+
+    co2g_base  = MJe * voy * EF_d + MJn * voy * EF_h                      # Alte Flotte, Diesel/HFO
+    co2g_retro = co2g_base * (1 - save)
+    co2g_new   = (MJe + MJn) * voy * fac * EF[:, 2:][:, f_sel].T
+    years      = np.array(YEARS_FULL)
+    co2g_opt   = np.where(years >= ny, co2g_new,
+                          np.where(years >= ty, co2g_retro, co2g_base))
+
+    total_co2_base = co2g_base.sum() / 1_000_000
+    total_co2_opt  = co2g_opt.sum() / 1_000_000
 
     # DataFrame für den direkten Vergleich
     co2_compare = pd.DataFrame({
@@ -352,39 +678,68 @@ def run_fleet_optimization(co2_prices: dict[int, float],
     return comp_df, savings_df, summary_df, co2_compare
 
 
+def run_fleet_optimization_batch(price_grid: list[tuple[dict, dict, dict]]) -> list[tuple]:
+    """
+    Löst mehrere Preisszenarien nacheinander (z. B. für Sensitivitätsanalysen).
+
+    price_grid: Liste von (co2_prices, diesel_prices, hfo_prices)
+    Rückgabe:   Ergebnis-Tupel von run_fleet_optimization, in Eingabereihenfolge
+
+    Bewusst sequenziell: bei gecachten Stammdaten dauert ein Lauf nur wenige
+    Millisekunden, ein Thread- oder Prozess-Pool kostet mehr, als er spart.
+    """
+    return [run_fleet_optimization(*prices) for prices in price_grid]
+
+
+@st.cache_data(show_spinner=False)
+def _run_cached(co2_items: tuple, diesel_items: tuple, hfo_items: tuple):
+    """
+    Memoisiert run_fleet_optimization auf den Slider-Preisen.
+    Schlüssel sind die sortierten (Jahr, Preis)-Tupel der drei Preis-Dicts.
+    """
+    return run_fleet_optimization(dict(co2_items), dict(diesel_items), dict(hfo_items))
+
+
+def _price_key(prices: dict) -> tuple:
+    """
+    Schlüssel für _run_cached: sortierte (Jahr, Preis)-Tupel, Preise als float –
+    so landen z. B. 100 (Slider) und 100.0 (skalierter Pfad) im selben Eintrag.
+    """
+    return tuple(sorted((y, float(p)) for y, p in prices.items()))
+
+
 # ───────────────────────────────────────────────────────────────────────────────
 # 2) Streamlit-UI (Sliders + Button)
 # ───────────────────────────────────────────────────────────────────────────────
 YE_REF = [2025, 2030, 2035, 2040, 2045, 2050]
 
-# CO₂-Preis Slider
-st.sidebar.header("CO₂-Price (USD/t)")
-co2_ref = {y: st.sidebar.slider(f"CO₂ Price in {y}", 0, 1000, 100, 50) for y in YE_REF}
-co2_prices = {
-    y: co2_ref[max(k for k in YE_REF if k <= y)]
-    for y in range(2025, 2051)
-}
-
-# Diesel-Preis Slider
-st.sidebar.header("Diesel-Price (USD/kg)")
-diesel_ref = {y: st.sidebar.slider(f"Diesel Price in {y}", 0.0, 10.0, 1.0, 0.5) for y in YE_REF}
-diesel_prices = {
-    y: diesel_ref[max(k for k in YE_REF if k <= y)]
-    for y in range(2025, 2051)
-}
-
-# HFO-Preis Slider (nun 0.0–1.5 USD/kg)
-st.sidebar.header("HFO-Price (USD/kg)")
-hfo_ref = {y: st.sidebar.slider(f"HFO Price in {y}", 0.0, 1.5, 1.0, 0.1) for y in YE_REF}
-hfo_prices = {
-    y: hfo_ref[max(k for k in YE_REF if k <= y)]
-    for y in range(2025, 2051)
-}
-
-if st.sidebar.button("🔍 Run Optimization"):
+# Slider in einem Formular: Verschieben löst keinen Rerun aus, erst ein Klick
+# auf einen der Buttons übernimmt alle Werte auf einmal.
+with st.sidebar.form("params"):
+    # CO₂-Preis Slider
+    st.header("CO₂-Price (USD/t)")
+    co2_ref = {y: st.slider(f"CO₂ Price in {y}", 0, 1000, 100, 50) for y in YE_REF}
+
+    # Diesel-Preis Slider
+    st.header("Diesel-Price (USD/kg)")
+    diesel_ref = {y: st.slider(f"Diesel Price in {y}", 0.0, 10.0, 1.0, 0.5) for y in YE_REF}
+
+    # HFO-Preis Slider (nun 0.0–1.5 USD/kg)
+    st.header("HFO-Price (USD/kg)")
+    hfo_ref = {y: st.slider(f"HFO Price in {y}", 0.0, 1.5, 1.0, 0.1) for y in YE_REF}
+
+    run_clicked   = st.form_submit_button("🔍 Run Optimization")
+    sweep_clicked = st.form_submit_button("📈 Run CO₂ Sensitivity Sweep")
+
+# Stützjahre → Jahreswerte: jeder Preis gilt bis zum nächsten Stützjahr (Forward-Fill)
+co2_prices    = pd.Series(co2_ref).reindex(YEARS_FULL, method="ffill").to_dict()
+diesel_prices = pd.Series(diesel_ref).reindex(YEARS_FULL, method="ffill").to_dict()
+hfo_prices    = pd.Series(hfo_ref).reindex(YEARS_FULL, method="ffill").to_dict()
+
+if run_clicked:
     with st.spinner("Calculating optimal Fleet…"):
-        comp_df, savings_df, summary_df, co2_compare = run_fleet_optimization(
-            co2_prices, diesel_prices, hfo_prices
+        comp_df, savings_df, summary_df, co2_compare = _run_cached(
+            _price_key(co2_prices), _price_key(diesel_prices), _price_key(hfo_prices),
         )
     st.success("Fertig!")
 
@@ -402,3 +757,34 @@ if st.sidebar.button("🔍 Run Optimization"):
         co2_compare
         .style.format({"Total CO2 (t)": "{:,.0f}", "Savings (t)": "{:,.0f}"})
     )
+
+# CO₂-Sensitivität: aktueller CO₂-Pfad skaliert, jedes Szenario über _run_cached
+# memoisiert – Faktor 1.0 trifft dabei den Cache-Eintrag des Run-Buttons
+SWEEP_FACTORS = [0.5, 0.75, 1.0, 1.25, 1.5]
+
+if sweep_clicked:
+    grid = [
+        ({y: p * k for y, p in co2_prices.items()}, diesel_prices, hfo_prices)
+        for k in SWEEP_FACTORS
+    ]
+    with st.spinner("Calculating scenarios…"):
+        results = [_run_cached(*map(_price_key, prices)) for prices in grid]
+
+    sweep_df = pd.concat(
+        [
+            pd.DataFrame({
+                "CO₂ Factor":     [k],
+                "Cost NPV (USD)": [comp.at[0, "Cost NPV (USD)"]],
+                "Savings (%)":    [sav.at[1, "Value"]],
+                "Total CO2 (t)":  [co2.at[0, "Total C02 (t)"]],
+            })
+            for k, (comp, sav, _, co2) in zip(SWEEP_FACTORS, results)
+        ],
+        ignore_index=True,
+    )
+
+    st.subheader("📈 CO₂-Price Sensitivity")
+    st.dataframe(sweep_df.style.format({
+        "CO₂ Factor": "{:.2f}", "Cost NPV (USD)": "{:,.0f}",
+        "Savings (%)": "{:.2f}", "Total CO2 (t)": "{:,.0f}",
+    }))
@@ -0,0 +1,57 @@
+# Parität der Entscheidungs-Löser: die Auszählung je Schiff (_solve_enumerate)
+# muss dieselben Entscheidungen und denselben Zielfunktionswert liefern wie das
+# MILP (_solve_milp) – über highspy und über das PuLP-Gerüst.
+#
+# Ausführen: python -m unittest discover -s tests
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import app  # noqa: E402
+
+
+class SolverParityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.use_highspy = app.USE_HIGHSPY
+
+    def tearDown(self):
+        app.USE_HIGHSPY = self.use_highspy
+
+    def assert_parity(self, delta_retro, delta_new, const=123.0):
+        ships = [f"Ship_{i}" for i in range(delta_retro.shape[0])]
+        obj, t_on, n_on = app._solve_enumerate(delta_retro, delta_new, const)
+
+        paths = [False] + ([True] if app.highspy is not None else [])
+        for use_highspy in paths:
+            with self.subTest(highspy=use_highspy):
+                app.USE_HIGHSPY = use_highspy
+                obj_m, t_m, n_m = app._solve_milp(ships, delta_retro, delta_new, const)
+                self.assertAlmostEqual(obj, obj_m, delta=1e-6 * max(1.0, abs(obj)))
+                np.testing.assert_array_equal(t_on, t_m)
+                np.testing.assert_array_equal(n_on, n_m)
+
+    def test_random_deltas(self):
+        rng = np.random.default_rng(0)
+        D = len(app.YEARS_DEC)
+        for S in (1, 4, 60):
+            for _ in range(3):
+                # ein Teil der Schiffe ohne lohnende Maßnahme (alle Deltas ≥ 0)
+                delta_retro = rng.normal(0.0, 1e6, (S, D))
+                delta_new   = rng.normal(0.0, 1e6, (S, D))
+                idle = rng.random(S) < 0.3
+                delta_retro[idle] = np.abs(delta_retro[idle])
+                delta_new[idle]   = np.abs(delta_new[idle])
+                self.assert_parity(delta_retro, delta_new)
+
+    def test_no_action(self):
+        D = len(app.YEARS_DEC)
+        self.assert_parity(np.ones((5, D)), np.ones((5, D)))
+
+
+if __name__ == "__main__":
+    unittest.main()